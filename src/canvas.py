@@ -21,12 +21,50 @@ class Canvas:
         self.width = width
         self.height = height
         self.bg_color = bg_color
-        self.canvas = np.ones((height, width, 3), dtype=np.uint8) * np.array(bg_color, dtype=np.uint8)
+        self.canvas = np.full((height, width, 3), bg_color, dtype=np.uint8)
         self.prev_x = None
         self.prev_y = None
         
         # Smoothing parameters
         self.position_buffer = deque(maxlen=5)  # Store last 5 positions for smoothing
+        self.sum_x = 0  # Running sums of the buffered positions
+        self.sum_y = 0
+        
+        # Region changed since last pop_dirty_rect(), as (x1, y1, x2, y2)
+        self.dirty_rect = (0, 0, width, height)
+        
+        # Stroke points not yet drawn, and the (color, thickness) they use
+        self._pending_pts = []
+        self._pending_style = None
+    
+    def _mark_dirty(self, x1, y1, x2, y2):
+        """
+        Grow the dirty region to include a rectangle.
+        
+        Args:
+            x1, y1: Top-left corner
+            x2, y2: Bottom-right corner (exclusive)
+        """
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(self.width, x2), min(self.height, y2)
+        if x1 >= x2 or y1 >= y2:
+            return
+        if self.dirty_rect is not None:
+            dx1, dy1, dx2, dy2 = self.dirty_rect
+            x1, y1 = min(x1, dx1), min(y1, dy1)
+            x2, y2 = max(x2, dx2), max(y2, dy2)
+        self.dirty_rect = (x1, y1, x2, y2)
+    
+    def pop_dirty_rect(self):
+        """
+        Get the region changed since the last call and reset it.
+        
+        Returns:
+            tuple or None: (x1, y1, x2, y2) or None if nothing changed
+        """
+        rect = self.dirty_rect
+        self.dirty_rect = None
+        return rect
     
     def draw_line(self, x, y, color, thickness):
         """
@@ -38,36 +76,75 @@ class Canvas:
             color: Line color in BGR format
             thickness: Line thickness
         """
-        # Add position to buffer
+        # Add position to buffer, keeping the running sums in step
+        if len(self.position_buffer) == self.position_buffer.maxlen:
+            old_x, old_y = self.position_buffer[0]
+            self.sum_x -= old_x
+            self.sum_y -= old_y
         self.position_buffer.append((x, y))
+        self.sum_x += x
+        self.sum_y += y
         
         # Calculate smoothed position
-        if len(self.position_buffer) > 0:
-            avg_x = int(sum(pos[0] for pos in self.position_buffer) / len(self.position_buffer))
-            avg_y = int(sum(pos[1] for pos in self.position_buffer) / len(self.position_buffer))
-            smoothed_x, smoothed_y = avg_x, avg_y
-        else:
-            smoothed_x, smoothed_y = x, y
+        count = len(self.position_buffer)
+        smoothed_x = int(self.sum_x / count)
+        smoothed_y = int(self.sum_y / count)
         
+        style = (color, thickness)
         if self.prev_x is not None and self.prev_y is not None:
-            # Draw smooth line
-            cv2.line(self.canvas, (self.prev_x, self.prev_y), (smoothed_x, smoothed_y), 
-                    color, thickness, cv2.LINE_AA)
+            # Queue the segment; it is drawn with the rest of the stroke in flush()
+            if style != self._pending_style:
+                self.flush()
+                self._pending_style = style
+            if not self._pending_pts:
+                self._pending_pts.append((self.prev_x, self.prev_y))
+            self._pending_pts.append((smoothed_x, smoothed_y))
         else:
             # Draw a dot for the starting point
+            self.flush()
             cv2.circle(self.canvas, (smoothed_x, smoothed_y), thickness // 2, color, -1)
+            pad = thickness // 2 + 2
+            self._mark_dirty(smoothed_x - pad, smoothed_y - pad,
+                             smoothed_x + pad + 1, smoothed_y + pad + 1)
+            self._pending_pts = [(smoothed_x, smoothed_y)]
+            self._pending_style = style
             
         self.prev_x, self.prev_y = smoothed_x, smoothed_y
     
+    def flush(self):
+        """Draw the queued stroke segments with a single polyline call."""
+        if len(self._pending_pts) < 2:
+            return
+        pts = np.asarray(self._pending_pts, np.int32)
+        color, thickness = self._pending_style
+        # Antialiasing is not visible on thin strokes, so skip its cost there
+        line_type = cv2.LINE_AA if thickness >= 4 else cv2.LINE_8
+        cv2.polylines(self.canvas, [pts], False, color, thickness, line_type)
+        
+        # Half the stroke width plus a pixel of antialiasing on each side
+        pad = thickness // 2 + 2
+        (x1, y1), (x2, y2) = pts.min(axis=0), pts.max(axis=0)
+        self._mark_dirty(int(x1) - pad, int(y1) - pad, int(x2) + pad + 1, int(y2) + pad + 1)
+        
+        # Keep the last point so the next segment joins up with this one
+        self._pending_pts = self._pending_pts[-1:]
+    
     def reset_position(self):
         """Reset the previous drawing position."""
+        self.flush()
+        self._pending_pts = []
+        self._pending_style = None
         self.prev_x, self.prev_y = None, None
         self.position_buffer.clear()
+        self.sum_x = 0
+        self.sum_y = 0
     
     def clear(self):
         """Clear the canvas to background color."""
-        self.canvas = np.ones((self.height, self.width, 3), dtype=np.uint8) * np.array(self.bg_color, dtype=np.uint8)
+        self._pending_pts = []
+        self.canvas[:] = self.bg_color
         self.reset_position()
+        self.dirty_rect = (0, 0, self.width, self.height)
     
     def resize(self, width, height):
         """
@@ -78,17 +155,20 @@ class Canvas:
             height: New height
         """
         if (self.height, self.width) != (height, width):
+            self.flush()
             self.canvas = cv2.resize(self.canvas, (width, height))
             self.width = width
             self.height = height
+            self.dirty_rect = (0, 0, width, height)
     
     def get_canvas(self):
         """
-        Get the current canvas.
+        Get the current canvas, with any queued stroke segments drawn.
         
         Returns:
             numpy.ndarray: Canvas image
         """
+        self.flush()
         return self.canvas
     
     def save(self, filename):
@@ -101,4 +181,5 @@ class Canvas:
         Returns:
             bool: True if save was successful
         """
+        self.flush()
         return cv2.imwrite(filename, self.canvas)
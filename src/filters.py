@@ -3,12 +3,22 @@ Smoothing filters for reducing jitter and noise in hand tracking.
 """
 import math
 
+import numpy as np
+
+
+def _as_signal(x):
+    """Leave scalars as they are and turn sequences into float arrays."""
+    if np.isscalar(x):
+        return x
+    return np.array(x, dtype=np.float64)
+
 
 class OneEuroFilter:
     """
     One Euro Filter for smoothing noisy signals.
     
     Provides low noise at low speeds and responsiveness at high speeds.
+    Accepts scalars or vectors such as (x, y), filtering each component.
     Based on: http://cristal.univ-lille.fr/~casiez/1euro/
     """
     
@@ -40,12 +50,14 @@ class OneEuroFilter:
         Apply the filter to a new value.
         
         Args:
-            x: New raw value
+            x: New raw value (scalar or sequence of components)
             timestamp: Optional timestamp (for variable frame rates)
             
         Returns:
-            float: Filtered value
+            float or numpy.ndarray: Filtered value
         """
+        x = _as_signal(x)
+        
         # Initialize on first call
         if self.x_prev is None:
             self.x_prev = x
@@ -60,7 +72,7 @@ class OneEuroFilter:
         dx_smooth = alpha_d * dx + (1.0 - alpha_d) * self.dx_prev
         
         # Calculate adaptive cutoff frequency
-        cutoff = self.min_cutoff + self.beta * abs(dx_smooth)
+        cutoff = self.min_cutoff + self.beta * np.abs(dx_smooth)
         
         # Smooth the signal
         alpha = self._smoothing_factor(cutoff)
@@ -82,7 +94,8 @@ class ExponentialSmoothing:
     """
     Simple exponential smoothing filter.
     
-    Fast and lightweight alternative to One Euro filter.
+    Fast and lightweight alternative to One Euro filter. Accepts scalars
+    or vectors such as (x, y), filtering each component.
     """
     
     def __init__(self, alpha=0.45):
@@ -100,11 +113,13 @@ class ExponentialSmoothing:
         Apply exponential smoothing.
         
         Args:
-            x: New raw value
+            x: New raw value (scalar or sequence of components)
             
         Returns:
-            float: Filtered value
+            float or numpy.ndarray: Filtered value
         """
+        x = _as_signal(x)
+        
         if self.value is None:
             self.value = x
             return x
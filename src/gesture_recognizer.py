@@ -1,13 +1,61 @@
 """
 Hand gesture recognition module for fingertip paint application.
 """
+import os
+import time
+from collections import namedtuple
+
+import cv2
 import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from src.jit import njit
+
+# MediaPipe hand landmark indices of the index, middle, ring and pinky
+# fingertips and their PIP joints
+TIP_IDX = np.array([8, 12, 16, 20])
+PIP_IDX = np.array([6, 10, 14, 18])
+INDEX_TIP_IDX = 8
+
+# Finger mask bits, index finger first: the low four are set for raised
+# fingers (tip above PIP) and the high four for lowered ones (tip below)
+INDEX_UP = 0x01
+OTHERS_DOWN = 0xE0
+ALL_UP = 0x0F
+
+# Tasks API results in the shape of the legacy Hands solution results
+HandResults = namedtuple('HandResults', ['multi_hand_landmarks'])
+
+
+@njit(cache=True)
+def _finger_mask(points):
+    """
+    Compare each fingertip with its PIP joint in one pass.
+    
+    Args:
+        points: (21, 3) array of landmark coordinates
+        
+    Returns:
+        int: Finger mask (see INDEX_UP, OTHERS_DOWN, ALL_UP)
+    """
+    mask = 0
+    for i in range(4):
+        tip_y = points[TIP_IDX[i], 1]
+        pip_y = points[PIP_IDX[i], 1]
+        if tip_y < pip_y:
+            mask |= 1 << i
+        elif tip_y > pip_y:
+            mask |= 1 << (i + 4)
+    return mask
 
 
 class GestureRecognizer:
     """Recognizes hand gestures using MediaPipe."""
     
-    def __init__(self, min_detection_confidence=0.7, min_tracking_confidence=0.7, max_num_hands=1):
+    def __init__(self, min_detection_confidence=0.7, min_tracking_confidence=0.7, max_num_hands=1,
+                 max_input_width=256, model_asset_path=None, delegate='gpu', model_complexity=1,
+                 use_opencl=False):
         """
         Initialize the gesture recognizer.
         
@@ -15,14 +63,129 @@ class GestureRecognizer:
             min_detection_confidence: Minimum confidence for hand detection
             min_tracking_confidence: Minimum confidence for hand tracking
             max_num_hands: Maximum number of hands to detect
+            max_input_width: Wider frames are downscaled to this width
+                before inference (None to keep full resolution)
+            model_asset_path: Optional MediaPipe Tasks hand landmarker
+                bundle (.task), e.g. a quantized build; uses the built-in
+                Hands solution when not given
+            delegate: 'gpu' or 'cpu', where the Tasks landmarker runs
+            model_complexity: Hands solution landmark model, 0 for the lite
+                model or 1 for the full one
+            use_opencl: Downscale and convert frames through OpenCL when
+                OpenCV has a usable device
         """
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence,
-            max_num_hands=max_num_hands
-        )
+        self.hands = None
+        self.landmarker = None
+        if model_asset_path:
+            self.landmarker = self._create_landmarker(
+                model_asset_path, delegate, min_detection_confidence,
+                min_tracking_confidence, max_num_hands)
+            self._last_timestamp_ms = -1
+        else:
+            self.hands = self.mp_hands.Hands(
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence,
+                max_num_hands=max_num_hands,
+                model_complexity=model_complexity
+            )
         self.mp_draw = mp.solutions.drawing_utils
+        self.max_input_width = max_input_width
+        
+        # Downscale and RGB conversion buffers reused across frames
+        self._small_buf = None
+        self._rgb_buf = None
+        
+        self.use_opencl = use_opencl and cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+        
+        # Landmark array and finger mask for the most recently converted hand
+        self._cached_landmarks = None
+        self._cached_points = None
+        self._cached_mask = None
+        
+        # Trigger the finger mask JIT build now, not on the first hand the
+        # camera sees
+        _finger_mask(np.zeros((21, 3)))
+    
+    def _create_landmarker(self, model_asset_path, delegate, min_detection_confidence,
+                           min_tracking_confidence, max_num_hands):
+        """
+        Create a MediaPipe Tasks hand landmarker.
+        
+        Video mode runs synchronously on the calling thread, which keeps
+        each inference worker in charge of its own landmarker. If the
+        landmarker fails to start on the GPU delegate it is retried on the
+        CPU delegate.
+        
+        Args:
+            model_asset_path: Path to the hand landmarker bundle
+            delegate: 'gpu' or 'cpu'
+            min_detection_confidence: Minimum confidence for hand detection
+            min_tracking_confidence: Minimum confidence for hand tracking
+            max_num_hands: Maximum number of hands to detect
+            
+        Returns:
+            mediapipe.tasks.vision.HandLandmarker
+        """
+        vision = mp.tasks.vision
+        delegates = {
+            'cpu': mp.tasks.BaseOptions.Delegate.CPU,
+            'gpu': mp.tasks.BaseOptions.Delegate.GPU,
+        }
+        delegate = delegate.lower()
+        if delegate not in delegates:
+            raise ValueError(f"Unknown hand tracking delegate {delegate!r}; "
+                             f"expected 'gpu' or 'cpu'")
+        # A missing bundle fails the same way on either delegate
+        if not os.path.isfile(model_asset_path):
+            raise FileNotFoundError(f"Hand landmarker bundle not found: {model_asset_path}")
+        options = vision.HandLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(
+                model_asset_path=model_asset_path,
+                delegate=delegates[delegate]),
+            running_mode=vision.RunningMode.VIDEO,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_tracking_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+        try:
+            return vision.HandLandmarker.create_from_options(options)
+        except (RuntimeError, NotImplementedError) as e:
+            if delegate != 'gpu':
+                raise
+            print(f"GPU landmarker failed to start ({e}); retrying on the CPU")
+            options.base_options.delegate = delegates['cpu']
+            return vision.HandLandmarker.create_from_options(options)
+    
+    def _detect_with_landmarker(self, rgb_frame):
+        """
+        Run the Tasks hand landmarker on a frame.
+        
+        Args:
+            rgb_frame: Frame in RGB format
+            
+        Returns:
+            HandResults: Landmarks as NormalizedLandmarkList protos, the
+            same shape the Hands solution returns
+        """
+        # Video mode requires strictly increasing timestamps
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        result = self.landmarker.detect_for_video(image, timestamp_ms)
+        if not result.hand_landmarks:
+            return HandResults(None)
+        
+        hands = []
+        for landmarks in result.hand_landmarks:
+            hand = landmark_pb2.NormalizedLandmarkList()
+            hand.landmark.extend(
+                landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z) for lm in landmarks)
+            hands.append(hand)
+        return HandResults(hands)
     
     def process_frame(self, rgb_frame):
         """
@@ -34,43 +197,117 @@ class GestureRecognizer:
         Returns:
             MediaPipe results object
         """
+        if self.landmarker is not None:
+            return self._detect_with_landmarker(rgb_frame)
         return self.hands.process(rgb_frame)
     
-    def is_index_finger_up(self, hand_landmarks):
+    def process_bgr_frame(self, bgr_frame):
         """
-        Check if only index finger is up (drawing gesture).
+        Convert a BGR camera frame to RGB and process it.
+        
+        Frames wider than max_input_width are downscaled first; the hand
+        models run at a few hundred pixels internally and landmarks are
+        normalized, so results still map onto the full frame. The resize
+        and conversion write into buffers reused across calls, so a
+        recognizer must only be fed from one thread.
         
         Args:
-            hand_landmarks: MediaPipe hand landmarks
+            bgr_frame: Frame in BGR format
             
         Returns:
-            bool: True if only index finger is up
+            MediaPipe results object
         """
-        landmarks = hand_landmarks.landmark
+        if self.use_opencl:
+            return self._process_bgr_frame_opencl(bgr_frame)
         
-        # Index finger tip and pip
-        index_tip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        index_pip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_PIP]
+        h, w = bgr_frame.shape[:2]
+        if self.max_input_width and w > self.max_input_width:
+            size = (self.max_input_width, round(h * self.max_input_width / w))
+            if self._small_buf is None or self._small_buf.shape[1::-1] != size:
+                self._small_buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            bgr_frame = cv2.resize(bgr_frame, size, dst=self._small_buf,
+                                   interpolation=cv2.INTER_AREA)
         
-        # Middle finger
-        middle_tip = landmarks[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-        middle_pip = landmarks[self.mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
+        if self._rgb_buf is None or self._rgb_buf.shape != bgr_frame.shape:
+            self._rgb_buf = np.empty_like(bgr_frame)
+        self._rgb_buf.flags.writeable = True
+        cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
         
-        # Ring finger
-        ring_tip = landmarks[self.mp_hands.HandLandmark.RING_FINGER_TIP]
-        ring_pip = landmarks[self.mp_hands.HandLandmark.RING_FINGER_PIP]
+        # A read-only array lets MediaPipe wrap the buffer without copying it
+        self._rgb_buf.flags.writeable = False
+        return self.process_frame(self._rgb_buf)
+    
+    def _process_bgr_frame_opencl(self, bgr_frame):
+        """
+        Downscale and convert a BGR frame on the OpenCL device, then process it.
         
-        # Pinky
-        pinky_tip = landmarks[self.mp_hands.HandLandmark.PINKY_TIP]
-        pinky_pip = landmarks[self.mp_hands.HandLandmark.PINKY_PIP]
+        Only the small RGB result is copied back from the device.
         
-        # Check if index finger is up and others are down
-        index_up = index_tip.y < index_pip.y
-        middle_down = middle_tip.y > middle_pip.y
-        ring_down = ring_tip.y > ring_pip.y
-        pinky_down = pinky_tip.y > pinky_pip.y
+        Args:
+            bgr_frame: Frame in BGR format
+            
+        Returns:
+            MediaPipe results object
+        """
+        frame = cv2.UMat(bgr_frame)
+        h, w = bgr_frame.shape[:2]
+        if self.max_input_width and w > self.max_input_width:
+            size = (self.max_input_width, round(h * self.max_input_width / w))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).get()
+        rgb.flags.writeable = False
+        return self.process_frame(rgb)
+    
+    def landmarks_to_array(self, hand_landmarks):
+        """
+        Get hand landmarks as an array of normalized coordinates.
+        
+        The array for the most recent hand is cached, so all gesture checks
+        on one frame share a single conversion.
+        
+        Args:
+            hand_landmarks: MediaPipe hand landmarks
+            
+        Returns:
+            numpy.ndarray: (21, 3) array of x, y, z
+        """
+        if hand_landmarks is not self._cached_landmarks:
+            landmarks = hand_landmarks.landmark
+            self._cached_points = np.fromiter(
+                (v for p in landmarks for v in (p.x, p.y, p.z)),
+                dtype=np.float64, count=3 * len(landmarks)).reshape(-1, 3)
+            self._cached_mask = None
+            self._cached_landmarks = hand_landmarks
+        return self._cached_points
+    
+    def finger_mask(self, hand_landmarks):
+        """
+        Get which fingers are raised or lowered as a bitmask.
+        
+        Args:
+            hand_landmarks: MediaPipe hand landmarks
+            
+        Returns:
+            int: Finger mask (see INDEX_UP, OTHERS_DOWN, ALL_UP)
+        """
+        points = self.landmarks_to_array(hand_landmarks)
+        if self._cached_mask is None:
+            self._cached_mask = _finger_mask(points)
+        return self._cached_mask
+    
+    def is_index_finger_up(self, hand_landmarks):
+        """
+        Check if only index finger is up (drawing gesture).
         
-        return index_up and middle_down and ring_down and pinky_down
+        Args:
+            hand_landmarks: MediaPipe hand landmarks
+            
+        Returns:
+            bool: True if only index finger is up
+        """
+        # Check if index finger is up and others are down
+        mask = self.finger_mask(hand_landmarks)
+        return mask & (INDEX_UP | OTHERS_DOWN) == INDEX_UP | OTHERS_DOWN
     
     def is_all_fingers_up(self, hand_landmarks):
         """
@@ -82,46 +319,26 @@ class GestureRecognizer:
         Returns:
             bool: True if at least 4 fingers are up
         """
-        landmarks = hand_landmarks.landmark
-        
-        fingers_up = 0
-        
-        # Check each finger
-        finger_tips = [
-            self.mp_hands.HandLandmark.INDEX_FINGER_TIP,
-            self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP,
-            self.mp_hands.HandLandmark.RING_FINGER_TIP,
-            self.mp_hands.HandLandmark.PINKY_TIP
-        ]
-        
-        finger_pips = [
-            self.mp_hands.HandLandmark.INDEX_FINGER_PIP,
-            self.mp_hands.HandLandmark.MIDDLE_FINGER_PIP,
-            self.mp_hands.HandLandmark.RING_FINGER_PIP,
-            self.mp_hands.HandLandmark.PINKY_PIP
-        ]
-        
-        for tip, pip in zip(finger_tips, finger_pips):
-            if landmarks[tip].y < landmarks[pip].y:
-                fingers_up += 1
-        
-        return fingers_up >= 4
+        return self.finger_mask(hand_landmarks) & ALL_UP == ALL_UP
     
-    def get_index_finger_position(self, hand_landmarks, frame_shape):
+    def get_index_finger_position(self, hand_landmarks, frame_shape, mirror=False):
         """
         Get the pixel coordinates of the index finger tip.
         
         Args:
             hand_landmarks: MediaPipe hand landmarks
             frame_shape: Shape of the frame (h, w, c)
+            mirror: Flip x so the position matches a mirrored view
             
         Returns:
             tuple: (x, y) coordinates
         """
-        index_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
+        tip_x, tip_y, _ = self.landmarks_to_array(hand_landmarks)[INDEX_TIP_IDX]
         h, w, _ = frame_shape
-        x = int(index_tip.x * w)
-        y = int(index_tip.y * h)
+        if mirror:
+            tip_x = 1.0 - tip_x
+        x = int(tip_x * w)
+        y = int(tip_y * h)
         return x, y
     
     def get_finger_depth(self, hand_landmarks):
@@ -135,8 +352,7 @@ class GestureRecognizer:
         Returns:
             float: Z-coordinate (depth) of index finger tip
         """
-        index_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        return index_tip.z
+        return float(self.landmarks_to_array(hand_landmarks)[INDEX_TIP_IDX, 2])
     
     def is_finger_close_enough(self, hand_landmarks, threshold=-0.05):
         """
@@ -165,4 +381,7 @@ class GestureRecognizer:
     
     def close(self):
         """Release resources."""
-        self.hands.close()
+        if self.landmarker is not None:
+            self.landmarker.close()
+        else:
+            self.hands.close()
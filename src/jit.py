@@ -0,0 +1,14 @@
+"""
+Optional Numba JIT compilation for small per-frame numeric helpers.
+"""
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback decorator that leaves the function uncompiled."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        return decorator
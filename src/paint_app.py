@@ -1,30 +1,103 @@
 """
 Main paint application logic.
 """
+import itertools
+import os
+import queue
+import sys
+import threading
+import time
+
 import cv2
+import numpy as np
 from src.gesture_recognizer import GestureRecognizer
 from src.canvas import Canvas
-from src.ui import UI
-from src.filters import ExponentialSmoothing, OutlierGuard
+from src.ui import UI, blit_layer, render_layer
+from src.filters import ExponentialSmoothing
+
+# Key codes as returned by cv2.waitKey() & 0xFF
+_KEY_Q, _KEY_S, _KEY_C, _KEY_V = map(ord, 'qscv')
+_KEY_PLUS = (ord('+'), ord('='))
+_KEY_MINUS = (ord('-'), ord('_'))
 
 
 class PaintApp:
     """Main paint application controller."""
     
-    def __init__(self):
-        """Initialize the paint application."""
+    # Canvas (width, height); fixed regardless of the camera resolution
+    CANVAS_SIZE = (1000, 700)
+    
+    def __init__(self, num_workers=2, hand_model_path=None):
+        """
+        Initialize the paint application.
+        
+        Args:
+            num_workers: Number of hand-tracking inference threads
+            hand_model_path: Optional MediaPipe Tasks hand landmarker
+                bundle; defaults to the PAINT_HAND_MODEL environment variable
+        """
+        if hand_model_path is None:
+            hand_model_path = os.environ.get('PAINT_HAND_MODEL')
+        # Tasks models run on the GPU unless PAINT_HAND_DELEGATE=cpu
+        hand_delegate = os.environ.get('PAINT_HAND_DELEGATE', 'gpu')
+        # Frame preprocessing goes through OpenCL only when asked for
+        use_opencl = os.environ.get('PAINT_OPENCL') == '1'
+        # The Hands solution uses its full landmark model unless PAINT_HAND_LITE=1
+        model_complexity = 0 if os.environ.get('PAINT_HAND_LITE') == '1' else 1
+        
         # Initialize components
-        self.gesture_recognizer = GestureRecognizer()
-        self.canvas = Canvas(width=1000, height=700)
+        # MediaPipe graphs are not thread-safe, so each inference worker
+        # gets its own recognizer; the first one also serves the render side
+        self.workers = [GestureRecognizer(max_num_hands=1, model_asset_path=hand_model_path,
+                                          delegate=hand_delegate,
+                                          model_complexity=model_complexity,
+                                          use_opencl=use_opencl)
+                        for _ in range(max(1, num_workers))]
+        self.gesture_recognizer = self.workers[0]
+        self.canvas_width, self.canvas_height = self.CANVAS_SIZE
+        self.canvas = Canvas(width=self.canvas_width, height=self.canvas_height)
         self.ui = UI()
+        # Strokes only start below the palette; the UI never changes its height
+        self._palette_y = self.ui.palette_height
         
         # Drawing state
         self.current_color = (0, 0, 255)  # Red in BGR
         self.brush_size = 3  # Smaller default size for better control
         self.eraser_mode = False
         
-        # Camera
+        # Camera and the capture format requested from it
         self.cap = None
+        self.camera_width = 640
+        self.camera_height = 480
+        self.camera_fps = 30
+        
+        # Capture thread hands frames to the inference workers through a
+        # one-slot queue (the newest frame always replaces a stale one);
+        # workers hand results to the render loop the same way, so a slow
+        # render drops the oldest results, and the loop skips stale ones
+        self._frame_queue = queue.Queue(maxsize=1)
+        self._result_queue = queue.Queue(maxsize=len(self.workers))
+        self._stop_event = threading.Event()
+        self._threads = []
+        # Exception that stopped a pipeline thread, re-raised by run()
+        self._thread_error = None
+        self._last_seq = -1
+        self._last_infer_seq = -1
+        
+        # Temporal subsampling: hand tracking runs on every Nth frame while
+        # a hand is tracked steadily; skipped frames keep the last tracked
+        # frame's state and only move the cursor, extrapolated from the
+        # smoothed positions of the last two detections
+        self._infer_every = 1
+        self._tracked_frames = 0
+        self._idle_frames = 0
+        self._frame_idx = 0
+        self._last_results = None
+        self._last_drawing = False
+        self._last_pos = None
+        self._prev_pos = None
+        self._infer_gap = 1
+        self._frames_since_infer = 0
         
         # Video feed window size (smaller, just for hand tracking)
         self.video_width = 320
@@ -33,6 +106,35 @@ class PaintApp:
         # Toggle for showing/hiding webcam
         self.show_webcam = False
         
+        # Keyboard shortcuts other than quit
+        self._key_actions = {
+            _KEY_S: self.save_canvas,
+            _KEY_C: self._clear_canvas,
+            _KEY_V: self._toggle_webcam,
+        }
+        self._key_actions.update(dict.fromkeys(_KEY_PLUS, self._increase_brush_size))
+        self._key_actions.update(dict.fromkeys(_KEY_MINUS, self._decrease_brush_size))
+        
+        # Display buffer reused across frames, and the regions drawn over
+        # the canvas on it that must be restored before the next frame
+        self._display_buf = None
+        self._overdrawn = []
+        # Video overlay area on the display buffer, while it is shown
+        self._video_rect = None
+        
+        # Pre-rendered cursor tiles, keyed by (brush_size, color, is_close_enough)
+        self._cursor_sprites = {}
+        
+        # UI state the display buffer was last rendered idle with (no hand
+        # and no preview), or None if the last frame was not idle
+        self._idle_key = None
+        
+        # Reused copy of the camera frame for the webcam preview, the
+        # thumbnail, and the view of the display buffer it is shown in
+        self._preview_buf = None
+        self._small_video_buf = None
+        self._overlay_roi = None
+        
                 # Hysteresis thresholds for depth-based drawing (Schmitt trigger)
         self.z_on_threshold = -0.06   # Start drawing when z < this
         self.z_off_threshold = -0.04  # Stop drawing when z > this
@@ -46,8 +148,7 @@ class PaintApp:
         self.off_count = 0  # Frames where finger is far
         
         # Lightweight exponential smoothing filters (much faster than One Euro)
-        self.filter_x = ExponentialSmoothing(alpha=0.6)  # Higher alpha = more responsive
-        self.filter_y = ExponentialSmoothing(alpha=0.6)
+        self.filter_xy = ExponentialSmoothing(alpha=0.6)  # Higher alpha = more responsive
         self.filter_z = ExponentialSmoothing(alpha=0.5)
     
     def process_drawing_gesture(self, x, y, frame_height, frame_width):
@@ -60,7 +161,7 @@ class PaintApp:
             frame_height: Frame height
             frame_width: Frame width
         """
-        if y > self.ui.palette_height:  # Below UI area
+        if y > self._palette_y:  # Below UI area
             color = (255, 255, 255) if self.eraser_mode else self.current_color
             thickness = self.brush_size * 3 if self.eraser_mode else self.brush_size
             self.canvas.draw_line(x, y, color, thickness)
@@ -82,40 +183,70 @@ class PaintApp:
             self.eraser_mode = False
             return
         
-        # Check if clicking eraser button
-        if self.ui.is_eraser_button_clicked(x, y, frame_width):
+        # Check if clicking the eraser or clear button
+        button = self.ui.which_button(x, y, frame_width)
+        if button == 'eraser':
             self.eraser_mode = not self.eraser_mode
-            return
-        
-        # Check if clicking clear button
-        if self.ui.is_clear_button_clicked(x, y, frame_width):
+        elif button == 'clear':
             self.canvas.clear()
     
-    def draw_cursor(self, display, x, y):
+    def _draw_cursor_shape(self, image, x, y):
         """
-        Draw a cursor at the finger position to show where drawing will occur.
+        Draw the cursor for the current brush and drawing state.
         
         Args:
-            display: Display image
+            image: Image to draw on
             x: X coordinate
             y: Y coordinate
         """
         if self.is_close_enough:
             # Drawing active - show filled circle with current color
-            cv2.circle(display, (x, y), self.brush_size, self.current_color, -1, cv2.LINE_AA)
+            cv2.circle(image, (x, y), self.brush_size, self.current_color, -1, cv2.LINE_AA)
             # Add white outline for visibility
-            cv2.circle(display, (x, y), self.brush_size + 2, (255, 255, 255), 1, cv2.LINE_AA)
-            cv2.circle(display, (x, y), self.brush_size + 3, (0, 0, 0), 1, cv2.LINE_AA)
+            cv2.circle(image, (x, y), self.brush_size + 2, (255, 255, 255), 1, cv2.LINE_AA)
+            cv2.circle(image, (x, y), self.brush_size + 3, (0, 0, 0), 1, cv2.LINE_AA)
         else:
             # Not close enough - show hollow circle
-            cv2.circle(display, (x, y), self.brush_size, (150, 150, 150), 1, cv2.LINE_AA)
+            cv2.circle(image, (x, y), self.brush_size, (150, 150, 150), 1, cv2.LINE_AA)
             # Small crosshair
             cross_size = 5
-            cv2.line(display, (x - cross_size, y), (x + cross_size, y), 
+            cv2.line(image, (x - cross_size, y), (x + cross_size, y), 
                     (150, 150, 150), 1, cv2.LINE_AA)
-            cv2.line(display, (x, y - cross_size), (x, y + cross_size), 
+            cv2.line(image, (x, y - cross_size), (x, y + cross_size), 
                     (150, 150, 150), 1, cv2.LINE_AA)
     
+    def _get_cursor_sprite(self):
+        """
+        Get the pre-rendered cursor for the current brush and drawing state.
+        
+        Returns:
+            tuple: (radius, layer), the layer rendered centered on a
+            (2*radius+1) square tile
+        """
+        key = (self.brush_size, self.current_color, self.is_close_enough)
+        sprite = self._cursor_sprites.get(key)
+        if sprite is None:
+            # Outer outline or crosshair plus a pixel of antialiasing
+            r = max(self.brush_size + 3, 5) + 2
+            layer = render_layer((2 * r + 1, 2 * r + 1, 3),
+                                 lambda tile: self._draw_cursor_shape(tile, r, r))
+            sprite = (r, layer)
+            self._cursor_sprites[key] = sprite
+        return sprite
+    
+    def draw_cursor(self, display, x, y):
+        """
+        Draw a cursor at the finger position to show where drawing will occur.
+        
+        Args:
+            display: Display image
+            x: X coordinate
+            y: Y coordinate
+        """
+        r, layer = self._get_cursor_sprite()
+        self._overdrawn.append((x - r, y - r, x + r + 1, y + r + 1))
+        blit_layer(display, layer, x - r, y - r)
+    
     def process_hand(self, hand_landmarks, frame_shape):
         """
         Process hand landmarks and perform actions.
@@ -128,7 +259,8 @@ class PaintApp:
             bool: True if currently drawing
         """
         h, w, _ = frame_shape
-        x, y = self.gesture_recognizer.get_index_finger_position(hand_landmarks, frame_shape)
+        x, y = self.gesture_recognizer.get_index_finger_position(hand_landmarks, frame_shape,
+                                                                 mirror=True)
         
         # Drawing mode - index finger only
         if self.gesture_recognizer.is_index_finger_up(hand_landmarks):
@@ -145,6 +277,37 @@ class PaintApp:
             self.canvas.reset_position()
             return False
     
+    def _refresh_display(self, canvas_img):
+        """
+        Bring the display buffer back in sync with the canvas.
+        
+        Only the regions changed on the canvas and the regions drawn over
+        on the previous frame are copied.
+        
+        Args:
+            canvas_img: Canvas image
+            
+        Returns:
+            numpy.ndarray: Display buffer
+        """
+        dirty_rect = self.canvas.pop_dirty_rect()
+        if self._display_buf is None or self._display_buf.shape != canvas_img.shape:
+            self._display_buf = np.empty_like(canvas_img)
+            np.copyto(self._display_buf, canvas_img)
+            self._overlay_roi = None
+        else:
+            rects = self._overdrawn
+            if dirty_rect is not None:
+                rects.append(dirty_rect)
+            h, w = canvas_img.shape[:2]
+            for x1, y1, x2, y2 in rects:
+                x1, y1 = max(0, x1), max(0, y1)
+                x2, y2 = min(w, x2), min(h, y2)
+                if x1 < x2 and y1 < y2:
+                    self._display_buf[y1:y2, x1:x2] = canvas_img[y1:y2, x1:x2]
+        self._overdrawn = []
+        return self._display_buf
+    
     def create_display_with_video_overlay(self, canvas_img, video_frame):
         """
         Create display with canvas and optional small video overlay.
@@ -154,19 +317,25 @@ class PaintApp:
             video_frame: Video frame
             
         Returns:
-            numpy.ndarray: Combined display
+            numpy.ndarray: Combined display (buffer reused between calls)
         """
-        # Start with canvas
-        display = canvas_img.copy()
+        # The overlay is redrawn in full while shown, so its area only
+        # needs restoring from the canvas once it is hidden again
+        if not self.show_webcam and self._video_rect is not None:
+            self._overdrawn.append(self._video_rect)
+            self._video_rect = None
+        
+        # Start with canvas in the reused display buffer
+        display = self._refresh_display(canvas_img)
         
         # Only show webcam if enabled
         if self.show_webcam:
-            # Resize video frame to small size
-            small_video = cv2.resize(video_frame, (self.video_width, self.video_height))
-            
             # Position for video overlay (bottom right corner)
             y_offset = display.shape[0] - self.video_height - 10
             x_offset = display.shape[1] - self.video_width - 10
+            if self._overlay_roi is None:
+                self._overlay_roi = display[y_offset:y_offset + self.video_height,
+                                            x_offset:x_offset + self.video_width]
             
             # Add border to video
             cv2.rectangle(display, 
@@ -174,12 +343,35 @@ class PaintApp:
                          (x_offset + self.video_width + 2, y_offset + self.video_height + 2),
                          (0, 0, 0), 2)
             
-            # Overlay video on canvas
-            display[y_offset:y_offset + self.video_height, 
-                    x_offset:x_offset + self.video_width] = small_video
+            # Shrink video frame to a thumbnail and mirror it straight into
+            # the overlay area; landmark coordinates are mirrored separately
+            if self._small_video_buf is None:
+                self._small_video_buf = np.empty((self.video_height, self.video_width, 3),
+                                                 dtype=np.uint8)
+            cv2.resize(video_frame, (self.video_width, self.video_height),
+                       dst=self._small_video_buf, interpolation=cv2.INTER_NEAREST)
+            cv2.flip(self._small_video_buf, 1, dst=self._overlay_roi)
+            self._video_rect = (x_offset - 3, y_offset - 3,
+                                x_offset + self.video_width + 4,
+                                y_offset + self.video_height + 4)
         
         return display
     
+    def detect_hands(self, recognizer, frame):
+        """
+        Run hand tracking on a camera frame.
+        
+        Args:
+            recognizer: GestureRecognizer to run inference with
+            frame: Camera frame
+            
+        Returns:
+            tuple: (frame, results)
+        """
+        # The frame is not mirrored here; positions and the preview are
+        # mirrored where they are used instead
+        return frame, recognizer.process_bgr_frame(frame)
+    
     def process_frame(self, frame):
         """
         Process a single frame.
@@ -190,87 +382,136 @@ class PaintApp:
         Returns:
             tuple: (processed_frame, is_drawing)
         """
-        # Flip frame horizontally for mirror effect
-        frame = cv2.flip(frame, 1)
-        h, w, _ = frame.shape
-        
-        # Keep canvas at a fixed size (800x600)
-        canvas_width = 1000
-        canvas_height = 700
-        if self.canvas.width != canvas_width or self.canvas.height != canvas_height:
-            self.canvas.resize(canvas_width, canvas_height)
+        self._frame_idx += 1
+        if self._frame_idx % self._infer_every:
+            results = None
+        else:
+            frame, results = self.detect_hands(self.gesture_recognizer, frame)
+        return self.render_frame(frame, results)
+    
+    def render_frame(self, frame, results):
+        """
+        Apply hand tracking results and build the display.
         
-        # Convert to RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.gesture_recognizer.process_frame(rgb_frame)
+        Args:
+            frame: Camera frame (not mirrored)
+            results: MediaPipe results for the frame, or None if hand
+                tracking was skipped for it
+            
+        Returns:
+            tuple: (processed_frame, is_drawing)
+        """
+        h, w, _ = frame.shape
+        canvas_width, canvas_height = self.canvas_width, self.canvas_height
+        scale_x = canvas_width / w
+        scale_y = canvas_height / h
+        gr = self.gesture_recognizer
+        is_up = gr.is_index_finger_up
+        all_up = gr.is_all_fingers_up
         
         # Create video preview frame with hand landmarks
-        video_preview = frame.copy()
+        video_preview = None
+        if self.show_webcam:
+            if self._preview_buf is None or self._preview_buf.shape != frame.shape:
+                self._preview_buf = np.empty_like(frame)
+            np.copyto(self._preview_buf, frame)
+            video_preview = self._preview_buf
+        
+        # Reuse the last results on frames that skipped hand tracking
+        reused = results is None
+        if reused:
+            results = self._last_results
+            self._frames_since_infer += 1
+        else:
+            self._last_results = results
+            self._infer_gap = self._frames_since_infer + 1
+            self._frames_since_infer = 0
+        hands = results.multi_hand_landmarks if results is not None else None
+        if not reused:
+            self._update_inference_stride(bool(hands))
         
         # Process hand landmarks
         drawing = False
-        self.is_close_enough = False
-        
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw hand landmarks on video preview
-                self.gesture_recognizer.draw_landmarks(video_preview, hand_landmarks)
-                
-                # Get raw coordinates and depth
-                raw_x, raw_y = self.gesture_recognizer.get_index_finger_position(hand_landmarks, frame.shape)
-                raw_z = self.gesture_recognizer.get_finger_depth(hand_landmarks)
-                
-                # Apply lightweight exponential smoothing
-                filtered_x = self.filter_x.filter(raw_x)
-                filtered_y = self.filter_y.filter(raw_y)
-                filtered_z = self.filter_z.filter(raw_z)
-                
-                # Scale coordinates to canvas size
-                canvas_x = int(filtered_x * canvas_width / w)
-                canvas_y = int(filtered_y * canvas_height / h)
-                
-                # Update cursor position
-                self.cursor_x = canvas_x
-                self.cursor_y = canvas_y
-                
-                # Hysteresis for depth (Schmitt trigger)
-                prev_close_enough = self.is_close_enough
-                
-                if filtered_z < self.z_on_threshold:
-                    self.on_count += 1
-                    self.off_count = 0
-                else:
-                    self.on_count = 0
-                
-                if filtered_z > self.z_off_threshold:
-                    self.off_count += 1
-                else:
-                    self.off_count = 0
-                
-                # Determine if close enough with debounce
-                self.is_close_enough = self.on_count >= self.debounce_frames
-                if self.off_count >= self.debounce_frames:
-                    self.is_close_enough = False
-                
-                # Reset canvas position when transitioning out of drawing range
-                if prev_close_enough and not self.is_close_enough:
-                    self.canvas.reset_position()
-                
-                # Drawing mode - index finger only AND close enough
-                if self.gesture_recognizer.is_index_finger_up(hand_landmarks):
-                    if self.is_close_enough:
-                        self.process_drawing_gesture(canvas_x, canvas_y, canvas_height, canvas_width)
-                        drawing = True
-                    else:
-                        # Not close enough - reset to avoid connecting strokes
-                        self.canvas.reset_position()
-                elif self.gesture_recognizer.is_all_fingers_up(hand_landmarks):
-                    self.canvas.reset_position()
-                    self.process_selection_gesture(canvas_x, canvas_y, canvas_height, canvas_width)
-                    self.cursor_x = None
-                    self.cursor_y = None
+        if not reused:
+            self.is_close_enough = False
+        
+        if hands and reused:
+            # Only one hand is tracked (max_num_hands=1)
+            hand_landmarks = hands[0]
+            # Draw the last tracked landmarks on video preview
+            if video_preview is not None:
+                gr.draw_landmarks(video_preview, hand_landmarks)
+            
+            # Depth state, gestures and strokes wait for the next tracked
+            # frame; only a shown cursor follows the extrapolated path
+            if self.cursor_x is not None and self._last_pos is not None:
+                est_x, est_y = self._extrapolate_position()
+                self.cursor_x = int(est_x * scale_x)
+                self.cursor_y = int(est_y * scale_y)
+            drawing = self._last_drawing
+        elif hands:
+            # Only one hand is tracked (max_num_hands=1)
+            hand_landmarks = hands[0]
+            # Draw hand landmarks on video preview
+            if video_preview is not None:
+                gr.draw_landmarks(video_preview, hand_landmarks)
+            
+            # Get raw coordinates and depth
+            raw_x, raw_y = gr.get_index_finger_position(hand_landmarks, frame.shape,
+                                                        mirror=True)
+            raw_z = gr.get_finger_depth(hand_landmarks)
+            
+            # Apply lightweight exponential smoothing
+            filtered_x, filtered_y = self.filter_xy.filter((raw_x, raw_y))
+            filtered_z = self.filter_z.filter(raw_z)
+            self._prev_pos, self._last_pos = self._last_pos, (filtered_x, filtered_y)
+            
+            # Scale coordinates to canvas size
+            canvas_x = int(filtered_x * scale_x)
+            canvas_y = int(filtered_y * scale_y)
+            
+            # Update cursor position
+            self.cursor_x = canvas_x
+            self.cursor_y = canvas_y
+            
+            # Hysteresis for depth (Schmitt trigger)
+            prev_close_enough = self.is_close_enough
+            
+            if filtered_z < self.z_on_threshold:
+                self.on_count += 1
+                self.off_count = 0
+            else:
+                self.on_count = 0
+            
+            if filtered_z > self.z_off_threshold:
+                self.off_count += 1
+            else:
+                self.off_count = 0
+            
+            # Determine if close enough with debounce
+            self.is_close_enough = self.on_count >= self.debounce_frames
+            if self.off_count >= self.debounce_frames:
+                self.is_close_enough = False
+            
+            # Reset canvas position when transitioning out of drawing range
+            if prev_close_enough and not self.is_close_enough:
+                self.canvas.reset_position()
+            
+            # Drawing mode - index finger only AND close enough
+            if is_up(hand_landmarks):
+                if self.is_close_enough:
+                    self.process_drawing_gesture(canvas_x, canvas_y, canvas_height, canvas_width)
+                    drawing = True
                 else:
+                    # Not close enough - reset to avoid connecting strokes
                     self.canvas.reset_position()
+            elif all_up(hand_landmarks):
+                self.canvas.reset_position()
+                self.process_selection_gesture(canvas_x, canvas_y, canvas_height, canvas_width)
+                self.cursor_x = None
+                self.cursor_y = None
+            else:
+                self.canvas.reset_position()
         else:
             self.canvas.reset_position()
             self.cursor_x = None
@@ -278,11 +519,26 @@ class PaintApp:
             self.on_count = 0
             self.off_count = 0
             # Reset filters when no hand detected
-            self.filter_x.reset()
-            self.filter_y.reset()
+            self.filter_xy.reset()
             self.filter_z.reset()
+            self._last_pos = self._prev_pos = None
+        
+        # Skipped frames report the drawing state of the last tracked one
+        if not reused:
+            self._last_drawing = drawing
+        
+        # Draw this frame's queued stroke segments
+        self.canvas.flush()
+        
+        # With no hand, no preview and nothing new on the canvas, the
+        # display would come out the same as the last idle frame
+        idle_key = None
+        if not hands and not self.show_webcam:
+            idle_key = (self.current_color, self.eraser_mode, self.brush_size)
+            if idle_key == self._idle_key and self.canvas.dirty_rect is None:
+                return self._display_buf, False
+        self._idle_key = idle_key
         
-        # Get canvas
         canvas_display = self.canvas.get_canvas()
         
         # Create display with video overlay
@@ -295,9 +551,9 @@ class PaintApp:
         # Determine status
         if drawing:
             status = "DRAWING"
-        elif self.is_close_enough and results.multi_hand_landmarks:
+        elif self.is_close_enough and hands:
             status = "READY TO DRAW"
-        elif results.multi_hand_landmarks:
+        elif hands:
             status = "MOVE CLOSER TO DRAW"
         else:
             status = "NO HAND DETECTED"
@@ -305,22 +561,245 @@ class PaintApp:
         # Draw UI
         self.ui.draw(display, self.current_color, self.eraser_mode, status, 
                     self.brush_size, self.show_webcam)
+        top_band_end, bottom_band_start = self.ui.get_overlay_bands(display.shape[1], display.shape[0])
+        self._overdrawn.append((0, 0, display.shape[1], top_band_end))
+        self._overdrawn.append((0, bottom_band_start, display.shape[1], display.shape[0]))
         
         return display, drawing
     
+    def _update_inference_stride(self, tracked):
+        """
+        Pick how often to run hand tracking from the latest detection.
+        
+        Args:
+            tracked: True if the latest tracked frame found a hand
+        """
+        if not tracked:
+            # Keep looking on every frame for a second after the hand is
+            # lost, then only on every other frame until one shows up
+            self._tracked_frames = 0
+            self._idle_frames += 1
+            self._infer_every = 2 if self._idle_frames >= 30 else 1
+            return
+        self._idle_frames = 0
+        self._tracked_frames += 1
+        self._infer_every = 3 if self._tracked_frames >= 5 else 2
+    
+    def _extrapolate_position(self):
+        """
+        Estimate the fingertip position on a frame that skipped tracking.
+        
+        Returns:
+            tuple: (x, y) in frame pixels, extrapolated linearly from the
+            smoothed positions of the last two detections
+        """
+        last_x, last_y = self._last_pos
+        if self._prev_pos is None:
+            return last_x, last_y
+        prev_x, prev_y = self._prev_pos
+        t = self._frames_since_infer / self._infer_gap
+        return last_x + (last_x - prev_x) * t, last_y + (last_y - prev_y) * t
+    
     def save_canvas(self):
         """Save the current canvas to a file."""
-        filename = f'fingertip_painting_{cv2.getTickCount()}.png'
+        filename = f'fingertip_painting_{time.time_ns()}.png'
         if self.canvas.save(filename):
             print(f'Drawing saved as {filename}')
             return True
         return False
     
-    def run(self):
-        """Run the main application loop."""
-        self.cap = cv2.VideoCapture(0)
+    def _clear_canvas(self):
+        """Clear the canvas from the keyboard."""
+        self.canvas.clear()
+        print("Canvas cleared")
+    
+    def _toggle_webcam(self):
+        """Show or hide the webcam preview."""
+        self.show_webcam = not self.show_webcam
+        status_msg = "visible" if self.show_webcam else "hidden"
+        print(f"Webcam {status_msg}")
+    
+    def _increase_brush_size(self):
+        """Grow the brush by one pixel."""
+        self.brush_size = min(50, self.brush_size + 1)
+        print(f"Brush size: {self.brush_size}")
+    
+    def _decrease_brush_size(self):
+        """Shrink the brush by one pixel."""
+        self.brush_size = max(1, self.brush_size - 1)
+        print(f"Brush size: {self.brush_size}")
+    
+    def _handle_key(self, key):
+        """
+        Run the action bound to a key.
+        
+        Args:
+            key: Key code from cv2.waitKey() & 0xFF
+            
+        Returns:
+            bool: False if the key quits the application
+        """
+        if key == _KEY_Q:
+            return False
+        action = self._key_actions.get(key)
+        if action is not None:
+            action()
+        return True
+    
+    @staticmethod
+    def _put_latest(q, item):
+        """
+        Put an item into a bounded queue, dropping the oldest entry if full.
+        
+        Args:
+            q: Bounded queue
+            item: Item to enqueue
+        """
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def _run_guarded(self, target, *args):
+        """
+        Run a pipeline thread's loop, stopping the pipeline if it raises.
+        
+        Args:
+            target: Loop to run
+            *args: Arguments for the loop
+        """
+        try:
+            target(*args)
+        except Exception as e:
+            self._thread_error = e
+            self._stop_event.set()
+    
+    def _capture_loop(self):
+        """Read camera frames into the frame queue until stopped."""
+        for seq in itertools.count():
+            if self._stop_event.is_set():
+                break
+            ret, frame = self.cap.read()
+            if not ret:
+                print("Error: Failed to capture frame")
+                self._stop_event.set()
+                break
+            # Replace any frame no worker has picked up yet, so workers
+            # always start on the newest one
+            self._put_latest(self._frame_queue, (seq, frame))
+    
+    def _inference_loop(self, recognizer):
+        """
+        Run hand tracking on captured frames until stopped.
+        
+        Args:
+            recognizer: GestureRecognizer owned by this thread
+        """
+        while not self._stop_event.is_set():
+            try:
+                seq, frame = self._frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if seq % self._infer_every:
+                item = (seq, frame, None)
+            else:
+                item = (seq,) + self.detect_hands(recognizer, frame)
+            # Never block on a slow render loop; it only wants the newest results
+            self._put_latest(self._result_queue, item)
+    
+    def _next_result(self):
+        """
+        Wait for the next in-order hand tracking result.
+        
+        Frames that skipped hand tracking are dropped if a newer frame has
+        already been rendered; tracked frames are only dropped if a newer
+        tracked frame has, since they still carry fresh hand positions.
+        
+        Keyboard input is still handled while waiting, so the window stays
+        responsive when results are slow to arrive.
+        
+        Returns:
+            tuple or None: (frame, results), or None once the pipeline has
+            stopped or quit was pressed
+        """
+        while not self._stop_event.is_set():
+            try:
+                seq, frame, results = self._result_queue.get(timeout=0.1)
+            except queue.Empty:
+                if not self._handle_key(cv2.waitKey(1) & 0xFF):
+                    return None
+                continue
+            if results is None:
+                if seq > self._last_seq:
+                    self._last_seq = seq
+                    return frame, results
+            elif seq > self._last_infer_seq:
+                self._last_infer_seq = seq
+                self._last_seq = max(self._last_seq, seq)
+                return frame, results
+        return None
+    
+    def _start_threads(self):
+        """Start the capture thread and one inference thread per worker."""
+        self._stop_event.clear()
+        self._thread_error = None
+        self._last_seq = -1
+        self._last_infer_seq = -1
+        self._threads = [threading.Thread(target=self._run_guarded,
+                                          args=(self._capture_loop,), daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._run_guarded,
+                             args=(self._inference_loop, worker), daemon=True)
+            for worker in self.workers
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def _stop_threads(self):
+        """Signal all pipeline threads to stop and wait for them."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+    
+    def _open_camera(self):
+        """
+        Open the webcam and request a fixed capture format.
         
+        Returns:
+            bool: True if the camera was opened
+        """
+        # V4L2 directly on Linux, rather than whichever backend OpenCV picks
+        if sys.platform.startswith('linux'):
+            self.cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
+            if not self.cap.isOpened():
+                self.cap = cv2.VideoCapture(0)
+        else:
+            self.cap = cv2.VideoCapture(0)
         if not self.cap.isOpened():
+            return False
+        
+        # MJPG is decoded far more cheaply than raw YUYV at these sizes,
+        # and a one-frame driver buffer keeps frames from going stale
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.camera_fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        print(f"Camera: {int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x"
+              f"{int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))} "
+              f"@ {self.cap.get(cv2.CAP_PROP_FPS):g} fps")
+        return True
+    
+    def run(self):
+        """Run the main application loop."""
+        if not self._open_camera():
             print("Error: Could not open webcam")
             return
         
@@ -340,42 +819,31 @@ class PaintApp:
         print("  - 'c' : Clear canvas")
         print("  - 'q' : Quit")
         
+        self._start_threads()
+        
         try:
             while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    print("Error: Failed to capture frame")
+                result = self._next_result()
+                if result is None:
+                    if self._thread_error is not None:
+                        raise self._thread_error
                     break
                 
                 # Process frame
-                processed_frame, _ = self.process_frame(frame)
+                processed_frame, _ = self.render_frame(*result)
                 
                 # Display
                 cv2.imshow('Fingertip Paint', processed_frame)
                 
                 # Handle keyboard input
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
+                if not self._handle_key(cv2.waitKey(1) & 0xFF):
                     break
-                elif key == ord('s'):
-                    self.save_canvas()
-                elif key == ord('c'):
-                    self.canvas.clear()
-                    print("Canvas cleared")
-                elif key == ord('v'):
-                    self.show_webcam = not self.show_webcam
-                    status_msg = "visible" if self.show_webcam else "hidden"
-                    print(f"Webcam {status_msg}")
-                elif key in [ord('+'), ord('=')]:
-                    self.brush_size = min(50, self.brush_size + 1)
-                    print(f"Brush size: {self.brush_size}")
-                elif key in [ord('-'), ord('_')]:
-                    self.brush_size = max(1, self.brush_size - 1)
-                    print(f"Brush size: {self.brush_size}")
         
         finally:
             # Cleanup
+            self._stop_threads()
             if self.cap:
                 self.cap.release()
             cv2.destroyAllWindows()
-            self.gesture_recognizer.close()
+            for worker in self.workers:
+                worker.close()
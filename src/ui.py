@@ -1,7 +1,84 @@
 """
 UI components for the paint application.
 """
+import bisect
+import functools
+from collections import OrderedDict, namedtuple
+
 import cv2
+import numpy as np
+
+# Scale-derived sizes used across the UI, computed once per frame width
+UIMetrics = namedtuple('UIMetrics', [
+    'scale',
+    # Palette
+    'palette_h', 'highlight_thickness', 'reserved_w',
+    # Buttons and indicators
+    'button_h', 'button_w', 'spacing', 'margin', 'brush_offset', 'webcam_offset',
+    'indicator_line', 'indicator_scale', 'indicator_thickness',
+    # Instructions and status
+    'instr_scale', 'instr_thickness', 'line_spacing', 'instr_y',
+    'status_scale', 'status_thickness', 'status_y', 'bottom_band',
+])
+
+
+def render_layer(shape, draw_fn):
+    """
+    Render elements off-screen into a premultiplied layer.
+    
+    The elements are drawn over a black and a white background. The
+    black render is the element color premultiplied by its coverage,
+    and the difference between the two renders is how much of the
+    background shows through, so antialiased edges composite exactly.
+    
+    Args:
+        shape: Shape of the image the layer is for
+        draw_fn: Callable that draws the elements onto an image
+        
+    Returns:
+        tuple: (x_offset, y_offset, image, transmit) cropped to the
+        covered area, or None if nothing was drawn
+    """
+    on_black = np.zeros(shape, dtype=np.uint8)
+    on_white = np.full(shape, 255, dtype=np.uint8)
+    draw_fn(on_black)
+    draw_fn(on_white)
+    transmit = on_white - on_black
+    
+    covered = (transmit < 255).any(axis=2)
+    rows = np.flatnonzero(covered.any(axis=1))
+    cols = np.flatnonzero(covered.any(axis=0))
+    if len(rows) == 0:
+        return None
+    y1, y2 = rows[0], rows[-1] + 1
+    x1, x2 = cols[0], cols[-1] + 1
+    return (x1, y1, on_black[y1:y2, x1:x2].copy(), transmit[y1:y2, x1:x2].copy())
+
+
+def blit_layer(frame, layer, x=0, y=0):
+    """
+    Composite a pre-rendered layer onto the frame, clipped to its edges.
+    
+    Args:
+        frame: Frame to draw on
+        layer: Layer from render_layer
+        x: Horizontal position of the layer's origin on the frame
+        y: Vertical position of the layer's origin on the frame
+    """
+    if layer is None:
+        return
+    lx, ly, image, transmit = layer
+    x += lx
+    y += ly
+    h, w = frame.shape[:2]
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(w, x + image.shape[1]), min(h, y + image.shape[0])
+    if x1 >= x2 or y1 >= y2:
+        return
+    tile = (slice(y1 - y, y2 - y), slice(x1 - x, x2 - x))
+    roi = frame[y1:y2, x1:x2]
+    cv2.multiply(roi, transmit[tile], dst=roi, scale=1.0 / 255)
+    cv2.add(roi, image[tile], dst=roi)
 
 
 class ColorPalette:
@@ -18,6 +95,25 @@ class ColorPalette:
         ((255, 255, 255), "White"),
     ]
 
+# UI scale for frame widths below each threshold, and 1.0 from the last one up
+_SCALE_WIDTHS = (600, 800, 1000)
+_SCALES = (0.5, 0.7, 0.85, 1.0)
+
+
+@functools.lru_cache(maxsize=16)
+def _scale_factor(frame_width):
+    """
+    Calculate scale factor based on frame width (see UI.get_scale_factor).
+    
+    Args:
+        frame_width: Width of the frame
+        
+    Returns:
+        float: Scale factor (0.5 to 1.0)
+    """
+    # Scale down UI elements for smaller screens
+    return _SCALES[bisect.bisect_right(_SCALE_WIDTHS, frame_width)]
+
 
 class UI:
     """Handles UI rendering."""
@@ -31,10 +127,49 @@ class UI:
         """
         self.palette_height = palette_height
         self.colors = ColorPalette.COLORS
+        self._color_to_index = {color: i for i, (color, _) in enumerate(self.colors)}
         
         # Minimum dimensions for proper display
         self.min_button_width = 60
         self.min_button_spacing = 5
+        
+        # Button bounds (x1, y1, x2, y2) for the layout width, also
+        # stacked in _hit_rects in _hit_labels order
+        self.eraser_button_bounds = None
+        self.clear_button_bounds = None
+        self._hit_labels = ('eraser', 'clear')
+        self._hit_rects = None
+        
+        # Palette layout for the last frame width: box x-ranges and a
+        # pixel-x to color index lookup table (-1 outside the palette)
+        self._layout_width = None
+        self._palette_height_px = None
+        self._palette_rects = None
+        self._palette_lut = None
+        
+        # Pre-rendered color boxes and the frame width they were drawn for
+        self._palette_layer_width = None
+        self._palette_layer = None
+        
+        # UIMetrics per frame width
+        self._metrics_cache = {}
+        
+        # Rendered buttons keyed by (width, height, label, is_active, scale)
+        self._button_cache = {}
+        
+        # Pre-rendered top bars (palette, buttons and indicators) keyed by
+        # the state they show, least recently used first
+        self._top_bar_cache = OrderedDict()
+        self._top_bar_cache_size = 32
+        
+        # Pre-rendered instruction text together with each status message,
+        # valid for the frame shape they were rendered at
+        self._text_shape = None
+        self._text_layers = {}
+        
+        # UI state drawn by the last draw call and the layers it used
+        self._last_state = None
+        self._last_layers = ()
     
     def get_scale_factor(self, frame_width):
         """
@@ -46,53 +181,141 @@ class UI:
         Returns:
             float: Scale factor (0.5 to 1.0)
         """
-        # Scale down UI elements for smaller screens
-        if frame_width < 600:
-            return 0.5
-        elif frame_width < 800:
-            return 0.7
-        elif frame_width < 1000:
-            return 0.85
-        else:
-            return 1.0
+        return _scale_factor(frame_width)
     
-    def draw_color_palette(self, frame, current_color, eraser_mode):
+    def _metrics(self, frame_width):
         """
-        Draw color palette on the frame.
+        Get the scale-derived UI sizes for a frame width.
         
         Args:
-            frame: Frame to draw on
-            current_color: Currently selected color
-            eraser_mode: Whether eraser mode is active
+            frame_width: Width of the frame
+            
+        Returns:
+            UIMetrics: Sizes for that width
         """
-        frame_width = frame.shape[1]
+        m = self._metrics_cache.get(frame_width)
+        if m is not None:
+            return m
+        if len(self._metrics_cache) >= 8:
+            self._metrics_cache.clear()
+        
         scale = self.get_scale_factor(frame_width)
+        m = UIMetrics(
+            scale=scale,
+            palette_h=int(self.palette_height * scale),
+            highlight_thickness=max(3, int(6 * scale)),
+            reserved_w=int(450 * scale),
+            button_h=int(60 * scale),
+            button_w=int(90 * scale),
+            spacing=int(10 * scale),
+            margin=int(10 * scale),
+            brush_offset=int(120 * scale),
+            webcam_offset=int(100 * scale),
+            indicator_line=int(25 * scale),
+            indicator_scale=0.3 + (0.2 * scale),
+            indicator_thickness=max(1, int(2 * scale)),
+            instr_scale=0.35 + (0.15 * scale),
+            instr_thickness=max(1, int(1 * scale)),
+            line_spacing=int(22 * scale),
+            instr_y=int(100 * scale),
+            status_scale=0.5 + (0.3 * scale),
+            status_thickness=max(1, int(2 * scale)),
+            status_y=int(15 * scale),
+            bottom_band=int(130 * scale),
+        )
+        self._metrics_cache[frame_width] = m
+        return m
+    
+    def _ensure_layout(self, frame_width):
+        """
+        Rebuild the palette and button layout if the frame width changed.
         
-        # Calculate dynamic palette height
-        dynamic_palette_height = int(self.palette_height * scale)
+        Args:
+            frame_width: Width of the frame
+        """
+        if frame_width == self._layout_width:
+            return
+        m = self._metrics(frame_width)
         
         # Calculate how much space we need for buttons on the right
         # Reserve more space to prevent overlap
-        reserved_width = int(450 * scale)
+        reserved_width = m.reserved_w
         available_width = max(frame_width - reserved_width, frame_width // 2)
-        
         color_box_width = available_width // len(self.colors)
         
-        for i, (color, name) in enumerate(self.colors):
-            x1 = i * color_box_width
-            x2 = (i + 1) * color_box_width
-            
+        self._palette_height_px = m.palette_h
+        self._palette_rects = [(i * color_box_width, (i + 1) * color_box_width)
+                               for i in range(len(self.colors))]
+        lut = np.full(frame_width, -1, dtype=np.int8)
+        lut[:len(self.colors) * color_box_width] = np.repeat(
+            np.arange(len(self.colors), dtype=np.int8), color_box_width)
+        self._palette_lut = lut
+        
+        # Buttons from right to left: clear (rightmost), then eraser, all
+        # at the same y position
+        clear_x2 = frame_width - m.margin
+        clear_x1 = clear_x2 - m.button_w
+        eraser_x2 = clear_x1 - m.spacing
+        eraser_x1 = eraser_x2 - m.button_w
+        button_y1 = m.margin
+        button_y2 = button_y1 + m.button_h
+        self.eraser_button_bounds = (eraser_x1, button_y1, eraser_x2, button_y2)
+        self.clear_button_bounds = (clear_x1, button_y1, clear_x2, button_y2)
+        self._hit_rects = np.array([self.eraser_button_bounds, self.clear_button_bounds],
+                                   dtype=np.int32)
+        self._layout_width = frame_width
+    
+    def draw_color_palette(self, frame, current_color, eraser_mode):
+        """
+        Draw color palette on the frame.
+        
+        Args:
+            frame: Frame to draw on
+            current_color: Currently selected color
+            eraser_mode: Whether eraser mode is active
+        """
+        frame_width = frame.shape[1]
+        self._ensure_layout(frame_width)
+        dynamic_palette_height = self._palette_height_px
+        
+        if frame_width != self._palette_layer_width:
+            shape = (dynamic_palette_height + 8, frame_width, 3)
+            self._palette_layer = render_layer(shape, self._draw_color_boxes)
+            self._palette_layer_width = frame_width
+        blit_layer(frame, self._palette_layer)
+        
+        # Highlight selected color with thicker green border
+        if eraser_mode:
+            return
+        selected = self._color_to_index.get(current_color)
+        if selected is None:
+            return
+        x1, x2 = self._palette_rects[selected]
+        highlight_thickness = self._metrics(frame_width).highlight_thickness
+        cv2.rectangle(frame, (x1, 0), (x2, dynamic_palette_height), 
+                    (0, 255, 0), highlight_thickness)
+        
+        # The next box was drawn over this border's right edge
+        if selected + 1 < len(self.colors):
+            self._draw_color_boxes(frame, selected + 1, selected + 2)
+    
+    def _draw_color_boxes(self, frame, start=0, stop=None):
+        """
+        Draw outlined color boxes, without any highlight.
+        
+        Args:
+            frame: Frame to draw on
+            start: Index of the first box to draw
+            stop: Index after the last box to draw (all remaining if None)
+        """
+        dynamic_palette_height = self._palette_height_px
+        boxes = zip(self._palette_rects[start:stop], self.colors[start:stop])
+        for (x1, x2), (color, name) in boxes:
             # Draw color box filled
             cv2.rectangle(frame, (x1, 0), (x2, dynamic_palette_height), color, -1)
             
             # Draw black outline around each color box
             cv2.rectangle(frame, (x1, 0), (x2, dynamic_palette_height), (0, 0, 0), 2)
-            
-            # Highlight selected color with thicker green border
-            if color == current_color and not eraser_mode:
-                highlight_thickness = max(3, int(6 * scale))
-                cv2.rectangle(frame, (x1, 0), (x2, dynamic_palette_height), 
-                            (0, 255, 0), highlight_thickness)
     
     def draw_button(self, frame, x1, y1, x2, y2, label, is_active=False, scale=1.0):
         """
@@ -106,21 +329,30 @@ class UI:
             is_active: Whether button is in active state
             scale: Scale factor for text
         """
-        color = (100, 255, 100) if is_active else (200, 200, 200)
-        cv2.rectangle(frame, (x1, y1), (x2, y2), color, -1)
-        
-        # Calculate text size based on scale and button size
-        button_width = x2 - x1
-        text_scale = min(0.5 * scale, button_width / 100)  # Adapt to button width
-        text_thickness = max(1, int(2 * scale))
-        
-        # Center text
-        text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, text_scale, text_thickness)[0]
-        text_x = x1 + (x2 - x1 - text_size[0]) // 2
-        text_y = y1 + (y2 - y1 + text_size[1]) // 2
+        key = (x2 - x1, y2 - y1, label, is_active, scale)
+        tile = self._button_cache.get(key)
+        if tile is None:
+            # Render the button once at the origin; the fill covers the
+            # corners inclusively, as cv2.rectangle does
+            tile = np.empty((y2 - y1 + 1, x2 - x1 + 1, 3), dtype=np.uint8)
+            tile[:] = (100, 255, 100) if is_active else (200, 200, 200)
+            
+            # Calculate text size based on scale and button size
+            button_width = x2 - x1
+            text_scale = min(0.5 * scale, button_width / 100)  # Adapt to button width
+            text_thickness = max(1, int(2 * scale))
+            
+            # Center text
+            text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, text_scale,
+                                        text_thickness)[0]
+            text_x = (x2 - x1 - text_size[0]) // 2
+            text_y = (y2 - y1 + text_size[1]) // 2
+            
+            cv2.putText(tile, label, (text_x, text_y), 
+                       cv2.FONT_HERSHEY_SIMPLEX, text_scale, (0, 0, 0), text_thickness)
+            self._button_cache[key] = tile
         
-        cv2.putText(frame, label, (text_x, text_y), 
-                   cv2.FONT_HERSHEY_SIMPLEX, text_scale, (0, 0, 0), text_thickness)
+        frame[y1:y2 + 1, x1:x2 + 1] = tile
     
     def draw_buttons(self, frame, eraser_mode, brush_size, show_webcam=False):
         """
@@ -133,29 +365,16 @@ class UI:
             show_webcam: Whether webcam is visible
         """
         width = frame.shape[1]
-        scale = self.get_scale_factor(width)
-        
-        # Calculate dynamic button dimensions
-        button_height = int(60 * scale)
-        button_width = int(90 * scale)
-        spacing = int(10 * scale)
-        margin = int(10 * scale)
+        m = self._metrics(width)
+        scale = m.scale
         
-        # Calculate positions from right to left
-        # Clear button (rightmost)
-        clear_x2 = width - margin
-        clear_x1 = clear_x2 - button_width
-        
-        # Eraser button
-        eraser_x2 = clear_x1 - spacing
-        eraser_x1 = eraser_x2 - button_width
+        # Button positions are shared with click detection
+        self._ensure_layout(width)
+        eraser_x1, button_y1, eraser_x2, button_y2 = self.eraser_button_bounds
+        clear_x1, _, clear_x2, _ = self.clear_button_bounds
         
         # Brush indicator position
-        brush_x = eraser_x1 - spacing - int(120 * scale)
-        
-        # All buttons at the same y position
-        button_y1 = margin
-        button_y2 = button_y1 + button_height
+        brush_x = eraser_x1 - m.spacing - m.brush_offset
         
         # Draw buttons
         self.draw_button(frame, eraser_x1, button_y1, eraser_x2, button_y2, 
@@ -164,30 +383,26 @@ class UI:
                         "CLEAR", False, scale)
         
         # Brush size indicator
-        brush_text_scale = 0.3 + (0.2 * scale)
-        brush_text_thickness = max(1, int(2 * scale))
-        brush_y = button_y1 + int(25 * scale)
+        brush_text_scale = m.indicator_scale
+        brush_text_thickness = m.indicator_thickness
+        brush_y = button_y1 + m.indicator_line
         
         cv2.putText(frame, f"Brush: {brush_size}px", (brush_x, brush_y), 
                    cv2.FONT_HERSHEY_SIMPLEX, brush_text_scale, (0, 0, 0), brush_text_thickness)
-        cv2.putText(frame, "[+/-]", (brush_x, brush_y + int(25 * scale)), 
+        cv2.putText(frame, "[+/-]", (brush_x, brush_y + m.indicator_line), 
                    cv2.FONT_HERSHEY_SIMPLEX, brush_text_scale * 0.8, (100, 100, 100), 
                    max(1, brush_text_thickness - 1))
         
         # Webcam indicator (small icon/text)
-        webcam_x = brush_x - int(100 * scale)
+        webcam_x = brush_x - m.webcam_offset
         webcam_status = "Cam:ON" if show_webcam else "Cam:OFF"
         webcam_color = (0, 200, 0) if show_webcam else (150, 150, 150)
         cv2.putText(frame, webcam_status, (webcam_x, brush_y), 
                    cv2.FONT_HERSHEY_SIMPLEX, brush_text_scale * 0.9, webcam_color, 
                    brush_text_thickness)
-        cv2.putText(frame, "[v]", (webcam_x, brush_y + int(25 * scale)), 
+        cv2.putText(frame, "[v]", (webcam_x, brush_y + m.indicator_line), 
                    cv2.FONT_HERSHEY_SIMPLEX, brush_text_scale * 0.8, (100, 100, 100), 
                    max(1, brush_text_thickness - 1))
-        
-        # Store button positions for click detection
-        self.eraser_button_bounds = (eraser_x1, button_y1, eraser_x2, button_y2)
-        self.clear_button_bounds = (clear_x1, button_y1, clear_x2, button_y2)
     
     def draw_instructions(self, frame):
         """
@@ -198,7 +413,7 @@ class UI:
         """
         width = frame.shape[1]
         height = frame.shape[0]
-        scale = self.get_scale_factor(width)
+        m = self._metrics(width)
         
         # Dynamic text based on screen size
         if width < 600:
@@ -218,15 +433,11 @@ class UI:
                 "'+'/'-' brush size | 'v' webcam | 's' save | 'c' clear | 'q' quit" 
             ]
         
-        text_scale = 0.35 + (0.15 * scale)
-        text_thickness = max(1, int(1 * scale))
-        line_spacing = int(22 * scale)
-        
         # Position instructions higher to avoid overlap with status
-        y_offset = height - int(100 * scale)
+        y_offset = height - m.instr_y
         for i, text in enumerate(instructions):
-            cv2.putText(frame, text, (10, y_offset + i * line_spacing), 
-                       cv2.FONT_HERSHEY_SIMPLEX, text_scale, (50, 50, 50), text_thickness)
+            cv2.putText(frame, text, (10, y_offset + i * m.line_spacing), 
+                       cv2.FONT_HERSHEY_SIMPLEX, m.instr_scale, (50, 50, 50), m.instr_thickness)
     
     def draw_status(self, frame, status):
         """
@@ -237,20 +448,98 @@ class UI:
             status: Status message to display
         """
         h = frame.shape[0]
-        width = frame.shape[1]
-        scale = self.get_scale_factor(width)
-        
-        text_scale = 0.5 + (0.3 * scale)
-        text_thickness = max(1, int(2 * scale))
+        m = self._metrics(frame.shape[1])
         
         # Position status at the very bottom, below instructions
-        cv2.putText(frame, status, (10, h - int(15 * scale)), 
-                   cv2.FONT_HERSHEY_SIMPLEX, text_scale, (0, 200, 0), text_thickness)
+        cv2.putText(frame, status, (10, h - m.status_y), 
+                   cv2.FONT_HERSHEY_SIMPLEX, m.status_scale, (0, 200, 0), m.status_thickness)
+    
+    def _top_bar_layer(self, shape, current_color, eraser_mode, brush_size, show_webcam):
+        """
+        Get the top bar layer for a state, rendering it if not cached.
+        
+        Layers for recently shown states are kept, so switching back and
+        forth (e.g. toggling the eraser) does not re-render them.
+        
+        Args:
+            shape: Shape of the frame the layer is for
+            current_color: Currently selected color
+            eraser_mode: Whether eraser mode is active
+            brush_size: Current brush size
+            show_webcam: Whether webcam is visible
+            
+        Returns:
+            tuple: Layer from render_layer
+        """
+        key = (shape, current_color, eraser_mode, brush_size, show_webcam)
+        cache = self._top_bar_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        
+        def draw_fn(layer):
+            self.draw_color_palette(layer, current_color, eraser_mode)
+            self.draw_buttons(layer, eraser_mode, brush_size, show_webcam)
+        
+        # Everything in the top bar lies within the top overlay band
+        band_end = self.get_overlay_bands(shape[1], shape[0])[0]
+        layer = render_layer((min(band_end, shape[0]),) + shape[1:], draw_fn)
+        cache[key] = layer
+        if len(cache) > self._top_bar_cache_size:
+            cache.popitem(last=False)
+        return layer
+    
+    def _text_layer(self, shape, status):
+        """
+        Get the instructions and status layer, rendering it if not cached.
+        
+        Args:
+            shape: Shape of the frame the layer is for
+            status: Status message to display
+            
+        Returns:
+            tuple: Layer from render_layer
+        """
+        if shape != self._text_shape:
+            self._text_layers = {}
+            self._text_shape = shape
+        
+        if status not in self._text_layers:
+            def draw_fn(layer):
+                self.draw_instructions(layer)
+                self.draw_status(layer, status)
+            self._text_layers[status] = render_layer(shape, draw_fn)
+        return self._text_layers[status]
+    
+    def get_overlay_bands(self, frame_width, frame_height):
+        """
+        Get the rows that UI elements are drawn over.
+        
+        Args:
+            frame_width: Width of the frame
+            frame_height: Height of the frame
+            
+        Returns:
+            tuple: (top_band_end, bottom_band_start) row indices
+        """
+        m = self._metrics(frame_width)
+        
+        # Palette plus its highlight border; buttons and indicators sit inside
+        top_band_end = m.palette_h + m.highlight_thickness
+        
+        # Instructions start 100 * scale above the bottom, leave room for
+        # the first line's glyph height
+        bottom_band_start = frame_height - m.bottom_band
+        
+        return top_band_end, bottom_band_start
     
     def draw(self, frame, current_color, eraser_mode, status, brush_size, show_webcam=False):
         """
         Draw all UI elements on the frame.
         
+        While the UI state is unchanged from the previous call, the layers
+        used last time are composited again without any cache lookups.
+        
         Args:
             frame: Frame to draw on
             current_color: Currently selected color
@@ -259,15 +548,23 @@ class UI:
             brush_size: Current brush size
             show_webcam: Whether webcam is visible
         """
-        self.draw_color_palette(frame, current_color, eraser_mode)
-        self.draw_buttons(frame, eraser_mode, brush_size, show_webcam)
-        self.draw_instructions(frame)
-        self.draw_status(frame, status)
+        state = (frame.shape, current_color, eraser_mode, status, brush_size, show_webcam)
+        if state != self._last_state:
+            self._last_layers = (
+                self._top_bar_layer(frame.shape, current_color, eraser_mode,
+                                    brush_size, show_webcam),
+                self._text_layer(frame.shape, status))
+            self._last_state = state
+        for layer in self._last_layers:
+            blit_layer(frame, layer)
     
     def get_color_from_position(self, x, y, frame_width):
         """
         Get color index from click position.
         
+        Uses the same layout the palette is drawn with, so only the
+        visible color boxes are hit.
+        
         Args:
             x: X coordinate
             y: Y coordinate
@@ -276,10 +573,10 @@ class UI:
         Returns:
             tuple or None: (color, name) if valid position, None otherwise
         """
-        if y < self.palette_height:
-            color_box_width = frame_width // len(self.colors)
-            color_index = x // color_box_width
-            if 0 <= color_index < len(self.colors):
+        self._ensure_layout(frame_width)
+        if 0 <= y < self._palette_height_px and 0 <= x < frame_width:
+            color_index = self._palette_lut[x]
+            if color_index >= 0:
                 return self.colors[color_index]
         return None
     
@@ -295,11 +592,9 @@ class UI:
         Returns:
             bool: True if eraser button was clicked
         """
-        if hasattr(self, 'eraser_button_bounds'):
-            x1, y1, x2, y2 = self.eraser_button_bounds
-            return x1 < x < x2 and y1 < y < y2
-        # Fallback to old calculation
-        return frame_width - 210 < x < frame_width - 110 and 10 < y < 70
+        self._ensure_layout(frame_width)
+        x1, y1, x2, y2 = self.eraser_button_bounds
+        return x1 < x < x2 and y1 < y < y2
     
     def is_clear_button_clicked(self, x, y, frame_width):
         """
@@ -313,8 +608,26 @@ class UI:
         Returns:
             bool: True if clear button was clicked
         """
-        if hasattr(self, 'clear_button_bounds'):
-            x1, y1, x2, y2 = self.clear_button_bounds
-            return x1 < x < x2 and y1 < y < y2
-        # Fallback to old calculation
-        return frame_width - 100 < x < frame_width - 10 and 10 < y < 70
+        self._ensure_layout(frame_width)
+        x1, y1, x2, y2 = self.clear_button_bounds
+        return x1 < x < x2 and y1 < y < y2
+    
+    def which_button(self, x, y, frame_width):
+        """
+        Find the button at a position.
+        
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            frame_width: Width of the frame
+            
+        Returns:
+            str or None: 'eraser' or 'clear' if a button was hit, None otherwise
+        """
+        self._ensure_layout(frame_width)
+        rects = self._hit_rects
+        hits = ((rects[:, 0] < x) & (x < rects[:, 2]) &
+                (rects[:, 1] < y) & (y < rects[:, 3]))
+        if not hits.any():
+            return None
+        return self._hit_labels[int(hits.argmax())]